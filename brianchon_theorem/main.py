@@ -12,8 +12,210 @@ import matplotlib.pyplot as plt
 from matplotlib.widgets import Button, RadioButtons, Slider, CheckButtons
 from matplotlib.patches import Ellipse, Circle
 import json
+from collections import OrderedDict
+from contextlib import contextmanager
 from datetime import datetime
 
+# Códigos de cónica usados en el historial compacto
+CONIC_TYPES = ('circle', 'ellipse', 'parabola', 'hyperbola')
+CONIC_CODES = {name: code for code, name in enumerate(CONIC_TYPES)}
+
+# Registro de estado de tamaño fijo: 1 + 2*8 + 4*8 = 49 bytes.
+# 100k estados ocupan ~4.9 MB.
+STATE_DTYPE = np.dtype([
+    ('conic', np.uint8),
+    ('params', np.float64, (2,)),
+    ('angles', np.float64, (4,)),
+])
+
+
+def make_record(conic_type, params, angles):
+    """Crea un registro de estado suelto con el formato del historial."""
+    record = np.zeros((), dtype=STATE_DTYPE)
+    record['conic'] = CONIC_CODES[conic_type]
+    record['params'] = params
+    record['angles'] = angles
+    return record
+
+
+class StateHistory:
+    """Historial de estados en un buffer circular preasignado.
+
+    El cursor marca el estado actual; deshacer/rehacer lo mueven y un
+    nuevo registro descarta la rama de rehacer. Cuando el buffer se
+    llena se sobrescriben los estados más antiguos.
+    """
+
+    def __init__(self, capacity=100_000):
+        self.capacity = capacity
+        self.records = np.zeros(capacity, dtype=STATE_DTYPE)
+        self.start = 0
+        self.count = 0
+        self.cursor = -1
+
+    def __len__(self):
+        return self.count
+
+    def _slot(self, index):
+        return (self.start + index) % self.capacity
+
+    def record(self, conic_type, params, angles):
+        """Agrega un estado después del cursor y devuelve su índice."""
+        # Descartar la rama de rehacer
+        self.count = self.cursor + 1
+        if self.count == self.capacity:
+            self.start = (self.start + 1) % self.capacity
+            self.count -= 1
+        self.records[self._slot(self.count)] = make_record(conic_type, params, angles)
+        self.count += 1
+        self.cursor = self.count - 1
+        return self.cursor
+
+    def current(self):
+        """Registro en el cursor, o None si el historial está vacío."""
+        if self.count == 0:
+            return None
+        return self.records[self._slot(self.cursor)]
+
+    def get(self, indices):
+        """Devuelve una copia de los registros en los índices lógicos dados."""
+        indices = np.asarray(indices)
+        return self.records[(self.start + indices) % self.capacity]
+
+    def can_undo(self):
+        return self.cursor > 0
+
+    def can_redo(self):
+        return self.cursor < self.count - 1
+
+    def seek(self, index):
+        """Mueve el cursor a un índice de la línea de tiempo."""
+        if self.count == 0:
+            return None
+        self.cursor = int(np.clip(index, 0, self.count - 1))
+        return self.current()
+
+    def undo(self):
+        return self.seek(self.cursor - 1)
+
+    def redo(self):
+        return self.seek(self.cursor + 1)
+
+
+def conic_points_batch(codes, params, angles):
+    """Puntos de tangencia para N estados. Devuelve un arreglo (N, 4, 2)."""
+    codes = codes[:, None]
+    a = params[:, 0:1]
+    b = params[:, 1:2]
+    cos, sin, tan = np.cos(angles), np.sin(angles), np.tan(angles)
+    x = np.empty_like(angles)
+    y = np.empty_like(angles)
+
+    # Círculo y elipse: (a cos t, b sin t); en el círculo b = a
+    is_circle = codes == CONIC_CODES['circle']
+    is_ellipse = codes == CONIC_CODES['ellipse']
+    mask = np.broadcast_to(is_circle | is_ellipse, angles.shape)
+    radius_b = np.where(is_circle, a, b)
+    x = np.where(mask, a * cos, x)
+    y = np.where(mask, radius_b * sin, y)
+
+    # Parábola: x = t, y = t²/(4p)
+    mask = np.broadcast_to(codes == CONIC_CODES['parabola'], angles.shape)
+    t = np.tan(angles - np.pi/2) * 2 * a
+    x = np.where(mask, t, x)
+    y = np.where(mask, t**2 / (4*a), y)
+
+    # Hipérbola: (±a sec t, b tan t) según la rama
+    mask = np.broadcast_to(codes == CONIC_CODES['hyperbola'], angles.shape)
+    branch = np.where((-np.pi/2 < angles) & (angles < np.pi/2), 1.0, -1.0)
+    x = np.where(mask, branch * a / cos, x)
+    y = np.where(mask, b * tan, y)
+
+    return np.stack([x, y], axis=-1)
+
+
+def tangent_lines_batch(codes, params, points):
+    """Líneas tangentes (ax + by + c = 0) para N estados: (N, 4, 3)."""
+    codes = codes[:, None]
+    a = params[:, 0:1]
+    b = params[:, 1:2]
+    x, y = points[..., 0], points[..., 1]
+    ones = np.ones_like(x)
+    lines = np.empty(points.shape[:-1] + (3,))
+
+    # Tangente al círculo: x*x₀ + y*y₀ = r²
+    circle = np.stack([x, y, -a**2 * ones], axis=-1)
+    # Tangente a la elipse: xx₀/a² + yy₀/b² = 1
+    ellipse = np.stack([x / a**2, y / b**2, -ones], axis=-1)
+    # Tangente a la hipérbola: xx₀/a² - yy₀/b² = 1
+    hyperbola = np.stack([x / a**2, -y / b**2, -ones], axis=-1)
+    # Tangente a y² = 4px en (x₀,y₀): yy₀ = 2p(x + x₀)
+    flat = np.abs(y) < 0.01
+    safe_y = np.where(flat, 1.0, y)
+    parabola = np.where(flat[..., None],
+                        np.stack([ones, 0 * ones, -x], axis=-1),
+                        np.stack([-2*a / safe_y, ones, 2*a*x / safe_y], axis=-1))
+
+    for name, value in (('circle', circle), ('ellipse', ellipse),
+                        ('parabola', parabola), ('hyperbola', hyperbola)):
+        mask = np.broadcast_to(codes == CONIC_CODES[name], x.shape)
+        lines[mask] = value[mask]
+    return lines
+
+
+def intersections_batch(lines1, lines2):
+    """Intersección de pares de líneas; inf si son paralelas."""
+    p = np.cross(lines1, lines2)
+    parallel = np.abs(p[..., 2]) < 1e-10
+    w = np.where(parallel, 1.0, p[..., 2])
+    result = p[..., :2] / w[..., None]
+    result[parallel] = np.inf
+    return result
+
+
+def compute_frames(records):
+    """Calcula en lote la geometría de varios registros de estado.
+
+    Devuelve un diccionario de arreglos con los puntos de tangencia,
+    los vértices del cuadrilátero y el punto de Brianchon de cada estado.
+    """
+    codes = records['conic']
+    params = records['params']
+    angles = records['angles']
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        points = conic_points_batch(codes, params, angles)
+        tangents = tangent_lines_batch(codes, params, points)
+        vertices = intersections_batch(tangents, np.roll(tangents, -1, axis=1))
+        homogeneous = np.concatenate(
+            [vertices, np.ones(vertices.shape[:-1] + (1,))], axis=-1)
+        diag1 = np.cross(homogeneous[:, 0], homogeneous[:, 2])
+        diag2 = np.cross(homogeneous[:, 1], homogeneous[:, 3])
+        brianchon = intersections_batch(diag1, diag2)
+    return {'tangent_points': points, 'vertices': vertices, 'brianchon': brianchon}
+
+
+class FrameCache:
+    """Caché LRU de geometría ya calculada, indexada por el registro de estado."""
+
+    def __init__(self, max_frames=2048):
+        self.max_frames = max_frames
+        self.frames = OrderedDict()
+
+    def get(self, record):
+        """Devuelve la geometría del registro, calculándola si no está en caché."""
+        key = record.tobytes()
+        if key in self.frames:
+            self.frames.move_to_end(key)
+            return self.frames[key]
+        computed = compute_frames(np.atleast_1d(record))
+        # Copias para que cada frame no retenga los arreglos del lote completo
+        frame = {name: values[0].copy() for name, values in computed.items()}
+        self.frames[key] = frame
+        if len(self.frames) > self.max_frames:
+            self.frames.popitem(last=False)
+        return frame
+
+
 class BrianchonInteractive:
     def __init__(self, conic_type='circle'):
         self.conic_type = conic_type
@@ -40,8 +242,15 @@ class BrianchonInteractive:
         self.show_info = True
         self.dark_mode = False
         
+        # Historial de estados (deshacer/rehacer y línea de tiempo)
+        self.history = StateHistory()
+        self.frame_cache = FrameCache()
+        self._syncing_widgets = False
+        
         # Crear interfaz
         self.setup_ui()
+        self.setup_artists()
+        self.record_state()
         self.update_plot()
         
     def setup_ui(self):
@@ -88,133 +297,90 @@ class BrianchonInteractive:
         self.btn_export = Button(ax_export, 'Exportar JSON')
         self.btn_export.on_clicked(self.export_data)
         
-    def get_conic_point(self, angle):
-        """Obtiene un punto en la cónica según el ángulo paramétrico."""
-        if self.conic_type == 'circle':
-            a = self.conic_params['circle']['a']
-            return np.array([a * np.cos(angle), a * np.sin(angle)])
+        # Línea de tiempo del historial
+        ax_timeline = plt.axes([0.30, 0.12, 0.60, 0.03])
+        self.slider_timeline = Slider(ax_timeline, 'Historial', 0, 1, valinit=0, valstep=1)
+        self.slider_timeline.on_changed(self.scrub)
         
-        elif self.conic_type == 'ellipse':
-            a = self.conic_params['ellipse']['a']
-            b = self.conic_params['ellipse']['b']
-            return np.array([a * np.cos(angle), b * np.sin(angle)])
+        ax_undo = plt.axes([0.30, 0.06, 0.10, 0.04])
+        self.btn_undo = Button(ax_undo, 'Deshacer')
+        self.btn_undo.on_clicked(self.undo)
         
-        elif self.conic_type == 'parabola':
-            # Parábola: x = t, y = t²/(4p)
-            p = self.conic_params['parabola']['p']
-            t = np.tan(angle - np.pi/2) * 2 * p
-            return np.array([t, t**2 / (4*p)])
+        ax_redo = plt.axes([0.42, 0.06, 0.10, 0.04])
+        self.btn_redo = Button(ax_redo, 'Rehacer')
+        self.btn_redo.on_clicked(self.redo)
         
-        elif self.conic_type == 'hyperbola':
-            # Hipérbola: x²/a² - y²/b² = 1
-            a = self.conic_params['hyperbola']['a']
-            b = self.conic_params['hyperbola']['b']
-            # Parametrización: (a*sec(t), b*tan(t))
-            if -np.pi/2 < angle < np.pi/2:
-                return np.array([a / np.cos(angle), b * np.tan(angle)])
-            else:
-                return np.array([-a / np.cos(angle), b * np.tan(angle)])
-    
-    def get_tangent_line(self, angle):
-        """Calcula la línea tangente en un ángulo dado (ax + by + c = 0)."""
-        point = self.get_conic_point(angle)
-        
-        if self.conic_type == 'circle':
-            # Tangente al círculo: x*x₀ + y*y₀ = r²
-            a = self.conic_params['circle']['a']
-            return np.array([point[0], point[1], -a**2])
+        # Un arrastre de slider completo cuenta como un solo paso de deshacer:
+        # el estado se guarda al soltar el botón del mouse
+        self.fig.canvas.mpl_connect('button_release_event', self.on_release)
         
-        elif self.conic_type == 'ellipse':
-            # Tangente a la elipse: xx₀/a² + yy₀/b² = 1
-            a = self.conic_params['ellipse']['a']
-            b = self.conic_params['ellipse']['b']
-            return np.array([point[0]/a**2, point[1]/b**2, -1])
+    def setup_artists(self):
+        """Crea una sola vez los artistas del gráfico; update_plot solo cambia sus datos."""
+        style = dict(color='lightgrey', fill=False, linestyle='--', linewidth=2)
+        self.conic_circle = self.ax.add_patch(Circle((0, 0), 1, **style))
+        self.conic_ellipse = self.ax.add_patch(Ellipse((0, 0), 2, 2, **style))
+        self.conic_lines = [self.ax.plot([], [], 'grey', linestyle='--', linewidth=2)[0]
+                            for _ in range(2)]
         
-        elif self.conic_type == 'parabola':
-            # Tangente a y² = 4px en (x₀,y₀): yy₀ = 2p(x + x₀)
-            p = self.conic_params['parabola']['p']
-            if abs(point[1]) < 0.01:
-                return np.array([1, 0, -point[0]])
-            return np.array([-2*p/point[1], 1, 2*p*point[0]/point[1]])
-        
-        elif self.conic_type == 'hyperbola':
-            # Tangente: xx₀/a² - yy₀/b² = 1
-            a = self.conic_params['hyperbola']['a']
-            b = self.conic_params['hyperbola']['b']
-            return np.array([point[0]/a**2, -point[1]/b**2, -1])
-    
-    def get_intersection(self, line1, line2):
-        """Calcula la intersección de dos líneas."""
-        p = np.cross(line1, line2)
-        if abs(p[2]) < 1e-10:
-            return np.array([np.inf, np.inf])
-        return p[:2] / p[2]
-    
-    def line_from_points(self, p1, p2):
-        """Crea una línea a partir de dos puntos."""
-        return np.cross([p1[0], p1[1], 1], [p2[0], p2[1], 1])
+        self.quad_line, = self.ax.plot([], [], 'b-', linewidth=2, label='Cuadrilátero circunscrito')
+        self.vertex_markers, = self.ax.plot([], [], 'bo', markersize=8)
+        self.diagonal_lines = [
+            self.ax.plot([], [], 'r--', alpha=0.6, linewidth=1.5, label='Diagonales')[0],
+            self.ax.plot([], [], 'r--', alpha=0.6, linewidth=1.5)[0],
+        ]
+        self.brianchon_marker, = self.ax.plot([], [], 'o', color='green', markersize=12,
+                                              label='Punto de Brianchon')
+        self.concurrent_text = self.ax.text(0.02, 0.98, "✓ Diagonales concurrentes",
+                                            transform=self.ax.transAxes, fontsize=14,
+                                            verticalalignment='top',
+                                            bbox=dict(boxstyle='round', facecolor='green', alpha=0.3))
+        self.tangent_markers, = self.ax.plot([], [], 'rs', markersize=10, label='Puntos tangencia')
+        self.point_labels = [self.ax.text(0, 0, f'  P{i+1}', fontsize=10, verticalalignment='bottom')
+                             for i in range(4)]
+        self.ax.grid(True, alpha=0.3)
     
     def update_plot(self):
-        self.ax.clear()
-        
         # Dibujar la cónica
         self.draw_conic()
         
-        # Calcular puntos de tangencia
-        self.tangent_points = [self.get_conic_point(a) for a in self.angles]
-        
-        # Calcular líneas tangentes
-        tangents = [self.get_tangent_line(a) for a in self.angles]
+        # Geometría del estado en pantalla (desde la caché si ya se calculó)
+        record = make_record(self.conic_type, self.current_params(), self.angles)
+        frame = self.frame_cache.get(record)
+        self.tangent_points = list(frame['tangent_points'])
+        vertices = frame['vertices']
+        intersection_point = frame['brianchon']
         
-        # Calcular vértices del cuadrilátero
-        vertices = []
-        for i in range(4):
-            v = self.get_intersection(tangents[i], tangents[(i+1)%4])
-            if not np.any(np.isinf(v)):
-                vertices.append(v)
-        
-        if len(vertices) == 4:
-            vertices = np.array(vertices)
-            
-            # Dibujar cuadrilátero
+        has_quad = bool(np.all(np.isfinite(vertices)))
+        has_point = has_quad and bool(np.all(np.isfinite(intersection_point)))
+        if has_quad:
+            # Cuadrilátero, vértices y diagonales
             quad_plot = np.vstack([vertices, vertices[0]])
-            self.ax.plot(quad_plot[:,0], quad_plot[:,1], 'b-', linewidth=2, label='Cuadrilátero circunscrito')
-            
-            # Dibujar vértices
-            self.ax.plot(vertices[:,0], vertices[:,1], 'bo', markersize=8)
-            
-            # Calcular diagonales
-            diag1 = self.line_from_points(vertices[0], vertices[2])
-            diag2 = self.line_from_points(vertices[1], vertices[3])
-            
-            # Dibujar diagonales
-            self.ax.plot([vertices[0,0], vertices[2,0]], [vertices[0,1], vertices[2,1]], 
-                        'r--', alpha=0.6, linewidth=1.5, label='Diagonales')
-            self.ax.plot([vertices[1,0], vertices[3,0]], [vertices[1,1], vertices[3,1]], 
-                        'r--', alpha=0.6, linewidth=1.5)
-            
-            # Calcular punto de Brianchon (intersección de diagonales)
-            intersection_point = self.get_intersection(diag1, diag2)
-            
-            if not np.any(np.isinf(intersection_point)):
-                self.ax.plot(intersection_point[0], intersection_point[1], 'o', 
-                           color='green', markersize=12, label='Punto de Brianchon')
-                
-                self.ax.text(0.02, 0.98, "✓ Diagonales concurrentes", transform=self.ax.transAxes,
-                           fontsize=14, verticalalignment='top',
-                           bbox=dict(boxstyle='round', facecolor='green', alpha=0.3))
+            self.quad_line.set_data(quad_plot[:,0], quad_plot[:,1])
+            self.vertex_markers.set_data(vertices[:,0], vertices[:,1])
+            self.diagonal_lines[0].set_data(vertices[[0, 2], 0], vertices[[0, 2], 1])
+            self.diagonal_lines[1].set_data(vertices[[1, 3], 0], vertices[[1, 3], 1])
+        if has_point:
+            # Punto de Brianchon (intersección de diagonales)
+            self.brianchon_marker.set_data([intersection_point[0]], [intersection_point[1]])
+        for artist in (self.quad_line, self.vertex_markers, *self.diagonal_lines):
+            artist.set_visible(has_quad)
+        self.brianchon_marker.set_visible(has_point)
+        self.concurrent_text.set_visible(has_point)
         
-        # Dibujar puntos de tangencia
-        for i, point in enumerate(self.tangent_points):
-            self.ax.plot(point[0], point[1], 'rs', markersize=10, 
-                        label='Puntos tangencia' if i == 0 else '')
-            if self.show_labels:
-                self.ax.text(point[0], point[1], f'  P{i+1}', fontsize=10, 
-                           verticalalignment='bottom')
+        # Puntos de tangencia
+        points = frame['tangent_points']
+        self.tangent_markers.set_data(points[:,0], points[:,1])
+        for label, point in zip(self.point_labels, points):
+            label.set_position(point)
+            label.set_visible(self.show_labels)
         
+        # set_data no actualiza los límites de datos; recalcularlos para el autoescalado
+        self.ax.relim(visible_only=True)
         self.ax.axis('equal')
-        self.ax.grid(True, alpha=0.3)
-        self.ax.legend(loc='upper right')
+        handles = [artist for artist in (self.quad_line, self.diagonal_lines[0],
+                                         self.brianchon_marker, self.tangent_markers)
+                   if artist.get_visible()]
+        self.ax.legend(handles=handles, loc='upper right')
         self.ax.set_title(f'Teorema de Brianchon - {self.conic_type.capitalize()}\n'
                          '(Usa los sliders para mover los puntos de tangencia)',
                          fontsize=12)
@@ -222,21 +388,23 @@ class BrianchonInteractive:
         self.fig.canvas.draw_idle()
     
     def draw_conic(self):
-        """Dibuja la cónica seleccionada."""
+        """Actualiza el trazo de la cónica seleccionada."""
+        self.conic_circle.set_visible(self.conic_type == 'circle')
+        self.conic_ellipse.set_visible(self.conic_type == 'ellipse')
+        self.conic_lines[0].set_visible(self.conic_type in ('parabola', 'hyperbola'))
+        self.conic_lines[1].set_visible(self.conic_type == 'hyperbola')
+        
         if self.conic_type == 'circle':
             a = self.conic_params['circle']['a']
-            circle = Circle((0, 0), a, color='lightgrey', fill=False, 
-                          linestyle='--', linewidth=2)
-            self.ax.add_patch(circle)
+            self.conic_circle.set_radius(a)
             self.ax.set_xlim(-3, 3)
             self.ax.set_ylim(-3, 3)
             
         elif self.conic_type == 'ellipse':
             a = self.conic_params['ellipse']['a']
             b = self.conic_params['ellipse']['b']
-            ellipse = Ellipse((0, 0), 2*a, 2*b, color='lightgrey', 
-                            fill=False, linestyle='--', linewidth=2)
-            self.ax.add_patch(ellipse)
+            self.conic_ellipse.set_width(2*a)
+            self.conic_ellipse.set_height(2*b)
             self.ax.set_xlim(-4, 4)
             self.ax.set_ylim(-3, 3)
             
@@ -245,7 +413,7 @@ class BrianchonInteractive:
             t = np.linspace(-4, 4, 200)
             x = t
             y = t**2 / (4*p)
-            self.ax.plot(x, y, 'grey', linestyle='--', linewidth=2)
+            self.conic_lines[0].set_data(x, y)
             self.ax.set_xlim(-5, 5)
             self.ax.set_ylim(-1, 6)
             
@@ -256,18 +424,22 @@ class BrianchonInteractive:
             x_pos = a * np.cosh(t)
             y_pos = b * np.sinh(t)
             x_neg = -a * np.cosh(t)
-            self.ax.plot(x_pos, y_pos, 'grey', linestyle='--', linewidth=2)
-            self.ax.plot(x_neg, y_pos, 'grey', linestyle='--', linewidth=2)
+            self.conic_lines[0].set_data(x_pos, y_pos)
+            self.conic_lines[1].set_data(x_neg, y_pos)
             self.ax.set_xlim(-5, 5)
             self.ax.set_ylim(-5, 5)
     
     def update_angle(self, val):
         """Actualiza los ángulos cuando los sliders cambian."""
+        if self._syncing_widgets:
+            return
         for i, slider in enumerate(self.angle_sliders):
             self.angles[i] = slider.val
         self.update_plot()
     
     def change_conic(self, label):
+        if self._syncing_widgets:
+            return
         conic_map = {
             'Círculo': 'circle',
             'Elipse': 'ellipse',
@@ -276,12 +448,14 @@ class BrianchonInteractive:
         }
         self.conic_type = conic_map.get(label, label.lower())
         self.angles = np.array([0, np.pi/2, np.pi, 3*np.pi/2])
-        for i, slider in enumerate(self.angle_sliders):
-            slider.set_val(self.angles[i])
+        self.sync_angle_sliders()
+        self.record_state()
         self.update_plot()
     
     def update_params(self, val):
         """Actualiza los parámetros de la cónica cuando los sliders cambian."""
+        if self._syncing_widgets:
+            return
         if self.conic_type == 'circle':
             self.conic_params['circle']['a'] = self.slider_a.val
             self.conic_params['circle']['b'] = self.slider_a.val
@@ -331,10 +505,108 @@ class BrianchonInteractive:
     
     def reset(self, event):
         self.angles = np.array([0, np.pi/2, np.pi, 3*np.pi/2])
-        for i, slider in enumerate(self.angle_sliders):
-            slider.set_val(self.angles[i])
+        self.sync_angle_sliders()
+        self.record_state()
         self.update_plot()
     
+    @contextmanager
+    def syncing_widgets(self):
+        """Permite mover widgets sin disparar callbacks ni redibujar la figura.
+
+        Quien lo usa redibuja una sola vez al final (update_plot o draw_idle).
+        """
+        widgets = [self.radio, self.slider_a, self.slider_b, self.slider_timeline,
+                   *self.angle_sliders]
+        self._syncing_widgets = True
+        for widget in widgets:
+            widget.drawon = False
+        try:
+            yield
+        finally:
+            for widget in widgets:
+                widget.drawon = True
+            self._syncing_widgets = False
+    
+    def sync_angle_sliders(self):
+        """Mueve los sliders de ángulo a self.angles sin disparar callbacks."""
+        with self.syncing_widgets():
+            for i, slider in enumerate(self.angle_sliders):
+                slider.set_val(self.angles[i])
+    
+    def current_params(self):
+        """Parámetros de la cónica actual como par (a, b); en la parábola (p, 0)."""
+        params = self.conic_params[self.conic_type]
+        if self.conic_type == 'parabola':
+            return (params['p'], 0.0)
+        return (params['a'], params['b'])
+    
+    def record_state(self):
+        """Guarda el estado actual en el historial y actualiza la línea de tiempo.
+
+        Si el estado es idéntico al actual del historial no se guarda nada,
+        así un cambio sin efecto no descarta la rama de rehacer.
+        Devuelve True si se agregó un registro.
+        """
+        params = self.current_params()
+        record = make_record(self.conic_type, params, self.angles)
+        current = self.history.current()
+        if current is not None and record.tobytes() == current.tobytes():
+            return False
+        self.history.record(self.conic_type, params, self.angles)
+        self.sync_timeline()
+        return True
+    
+    def on_release(self, event):
+        """Guarda el estado al terminar un arrastre de slider."""
+        if self.record_state():
+            self.fig.canvas.draw_idle()
+    
+    def sync_timeline(self):
+        """Ajusta el rango y la posición del slider del historial."""
+        with self.syncing_widgets():
+            valmax = max(len(self.history) - 1, 1)
+            self.slider_timeline.valmax = valmax
+            self.slider_timeline.ax.set_xlim(0, valmax)
+            self.slider_timeline.set_val(self.history.cursor)
+    
+    def apply_state(self, record):
+        """Restaura un estado del historial en la figura y los widgets."""
+        self.conic_type = CONIC_TYPES[record['conic']]
+        a, b = record['params']
+        if self.conic_type == 'parabola':
+            self.conic_params['parabola']['p'] = a
+        else:
+            self.conic_params[self.conic_type]['a'] = a
+            self.conic_params[self.conic_type]['b'] = b
+        self.angles = np.array(record['angles'], dtype=float)
+        
+        with self.syncing_widgets():
+            self.radio.set_active(CONIC_CODES[self.conic_type])
+            self.slider_a.set_val(a)
+            if self.conic_type in ('ellipse', 'hyperbola'):
+                self.slider_b.set_val(b)
+            for i, slider in enumerate(self.angle_sliders):
+                slider.set_val(self.angles[i])
+        self.sync_timeline()
+        self.update_plot()
+    
+    def scrub(self, val):
+        """Salta a un estado de la línea de tiempo."""
+        if self._syncing_widgets:
+            return
+        index = int(round(val))
+        if index == self.history.cursor:
+            return
+        self.apply_state(self.history.seek(index))
+    
+    def undo(self, event):
+        if self.history.can_undo():
+            self.apply_state(self.history.undo())
+    
+    def redo(self, event):
+        if self.history.can_redo():
+            self.apply_state(self.history.redo())
+    
     def save_figure(self, event):
         filename = f'brianchon_{self.conic_type}.png'
         self.fig.savefig(filename, dpi=300, bbox_inches='tight')
@@ -0,0 +1,80 @@
+import numpy as np
+
+from main import StateHistory, compute_frames, make_record
+
+
+def record_index(history, i):
+    history.record('circle', (1.0, 1.0), [i, 0, 0, 0])
+
+
+def first_angle(record):
+    return record['angles'][0]
+
+
+def timeline(history):
+    return list(history.get(np.arange(len(history)))['angles'][:, 0])
+
+
+def test_historial_vacio():
+    history = StateHistory(capacity=4)
+    assert len(history) == 0
+    assert history.current() is None
+    assert history.seek(0) is None
+    assert not history.can_undo()
+    assert not history.can_redo()
+
+
+def test_deshacer_rehacer_y_seek_acotado():
+    history = StateHistory(capacity=10)
+    for i in range(4):
+        record_index(history, i)
+    assert first_angle(history.undo()) == 2
+    assert first_angle(history.undo()) == 1
+    assert first_angle(history.redo()) == 2
+    assert first_angle(history.seek(-5)) == 0
+    assert not history.can_undo()
+    assert first_angle(history.seek(99)) == 3
+    assert not history.can_redo()
+
+
+def test_nuevo_registro_descarta_rama_de_rehacer():
+    history = StateHistory(capacity=10)
+    for i in range(4):
+        record_index(history, i)
+    history.seek(1)
+    record_index(history, 7)
+    assert timeline(history) == [0, 1, 7]
+    assert history.cursor == 2
+    assert not history.can_redo()
+
+
+def test_buffer_circular_sobrescribe_los_mas_antiguos():
+    history = StateHistory(capacity=4)
+    for i in range(7):
+        record_index(history, i)
+    assert len(history) == 4
+    assert timeline(history) == [3, 4, 5, 6]
+    assert first_angle(history.seek(0)) == 3
+
+
+def test_rama_descartada_con_buffer_lleno():
+    history = StateHistory(capacity=4)
+    for i in range(6):
+        record_index(history, i)
+    # Línea de tiempo [2, 3, 4, 5] envuelta en el buffer; volver al inicio
+    history.seek(0)
+    record_index(history, 9)
+    assert timeline(history) == [2, 9]
+    record_index(history, 10)
+    record_index(history, 11)
+    record_index(history, 12)
+    assert timeline(history) == [9, 10, 11, 12]
+    assert history.cursor == 3
+
+
+def test_geometria_circulo():
+    record = make_record('circle', (1.0, 1.0), [0, np.pi/2, np.pi, 3*np.pi/2])
+    frame = compute_frames(np.atleast_1d(record))
+    vertices = frame['vertices'][0]
+    assert np.allclose(np.abs(vertices), 1.0)
+    assert np.allclose(frame['brianchon'][0], [0.0, 0.0])